@@ -7,15 +7,97 @@ Processes cable data from CSV and provides thermal parameters
 
 import pandas as pd
 import numpy as np
+import json
 import os
+import sys
+import threading
+from dataclasses import dataclass
+if 'eventlet' in sys.modules:
+    from eventlet import patcher
+    
+    # Under eventlet the background load has to run on a real OS thread, a green
+    # thread would block the hub until the CSV is parsed
+    if patcher.is_monkey_patched('thread'):
+        threading = patcher.original('threading')
 from thermal_engine import CableGeometry, MaterialProperties
 
+# CSV columns used by the library, mapped to their internal names
+CSV_COLUMNS = {
+    'CABLE_SIZE': 'cable_size',
+    'RATING': 'voltage',
+    'MATERIAL': 'material',
+    'INSUL_MATERIAL': 'insul_material'
+}
+
+# AWG sizes (kcmil equivalents) used in MCM cable size designations
+AWG_TO_MCM = {
+    '4/0': 211.6,
+    '3/0': 167.8,
+    '2/0': 133.1,
+    '1/0': 105.6
+}
+
+# Maximum operating temperature by insulation type (°C)
+TEMPERATURE_LIMITS = {
+    'XLPE': 90.0,
+    'EPR': 90.0,
+    'Paper': 80.0,
+    'PILC': 85.0,
+    'PVC': 70.0
+}
+
+# Parsed values by cable size and voltage designation, the CSV only has a few distinct ones
+_AREA_CACHE = {}
+_INSULATION_CACHE = {}
+
+@dataclass(frozen=True)
+class CableRecord:
+    """Cable data and thermal parameters for one library entry"""
+    __slots__ = ('name', 'description', 'cable_size', 'voltage', 'conductor_material', 'insulation_type',
+                 'conductor_area', 'conductor_diameter', 'insulation_thickness', 'sheath_thickness',
+                 'max_temp', 'geometry', 'materials')
+    
+    name: str
+    description: str
+    cable_size: str
+    voltage: str
+    conductor_material: str
+    insulation_type: str
+    conductor_area: float  # mm²
+    conductor_diameter: float  # mm
+    insulation_thickness: float  # mm
+    sheath_thickness: float  # mm
+    max_temp: float  # °C
+    geometry: CableGeometry
+    materials: MaterialProperties
+    
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __setstate__(self, state):
+        # The frozen __setattr__ would reject restoring the slots, so bypass it
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
 class CableLibrary:
     """Cable library with thermal parameter calculation"""
     
     def __init__(self):
         self.cables = {}
-        self.load_cable_data()
+        self._material_cache = {}
+        self._geometry_cache = {}
+        
+        # Load in the background so startup and health checks don't wait on the CSV
+        self._load_thread = threading.Thread(target=self.load_cable_data, daemon=True)
+        self._load_thread.start()
+    
+    def wait_until_loaded(self):
+        """Block until the background load has finished"""
+        self._load_thread.join()
+    
+    def is_loaded(self):
+        """Check whether the background load has finished"""
+        return not self._load_thread.is_alive()
     
     def load_cable_data(self):
         """Load cable data from CSV file"""
@@ -23,12 +105,29 @@ class CableLibrary:
         
         try:
             # Read CSV file
-            df = pd.read_csv(csv_path)
+            df = self.read_cable_csv(csv_path)
+            
+            # Extract basic cable information as whole columns
+            cable_size = self.get_column(df, 'cable_size', '')
+            voltage = self.get_column(df, 'voltage', '')
+            material = self.get_column(df, 'material', 'CU')
+            insulation = self.get_column(df, 'insul_material', 'XLPE')
+            
+            # Calculate thermal parameters for all rows at once
+            cable_ids = self.create_cable_ids(cable_size, voltage, material, insulation)
+            conductor_area = self.calculate_conductor_areas(cable_size)
+            conductor_diameter = 2 * np.sqrt(conductor_area / np.pi)
+            insulation_thickness = self.estimate_insulation_thicknesses(voltage)
+            max_temp = insulation.map(TEMPERATURE_LIMITS).fillna(90.0).to_numpy(dtype=float)
+            
+            rows = zip(cable_ids.tolist(), cable_size.tolist(), voltage.tolist(),
+                       material.tolist(), insulation.tolist(), conductor_area.tolist(),
+                       conductor_diameter.tolist(), insulation_thickness.tolist(),
+                       max_temp.tolist())
             
-            for index, row in df.iterrows():
+            for index, (cable_id, *values) in enumerate(rows):
                 try:
-                    cable_id = self.create_cable_id(row)
-                    cable_data = self.process_cable_row(row)
+                    cable_data = self.process_cable_row(*values)
                     if cable_data:
                         self.cables[cable_id] = cable_data
                 except Exception as e:
@@ -39,54 +138,69 @@ class CableLibrary:
             print(f"Error loading cable library: {e}")
             # Load default cables if CSV fails
             self.load_default_cables()
+        
+        # The library is fixed once loaded, so build the cable type list once
+        self._cable_types_cache = [
+            {
+                'id': cable_id,
+                'name': cable_data.name,
+                'description': cable_data.description,
+                'voltage': cable_data.voltage,
+                'conductor_material': cable_data.conductor_material,
+                'insulation_type': cable_data.insulation_type,
+                'max_temp': cable_data.max_temp
+            }
+            for cable_id, cable_data in self.cables.items()
+        ]
+        self._cable_types_json = json.dumps({'cable_types': self._cable_types_cache})
     
-    def create_cable_id(self, row):
-        """Create unique cable identifier"""
-        size = str(row.get('cable_size', '')).replace(' ', '_').replace('/', '_')
-        voltage = str(row.get('voltage', '')).replace(' ', '_').replace('/', '_')
-        material = str(row.get('material', 'CU'))
-        insulation = str(row.get('insul_material', 'XLPE'))
+    def read_cable_csv(self, csv_path):
+        """Read only the columns used by the library, as strings"""
+        read_options = {'usecols': list(CSV_COLUMNS), 'dtype': 'string'}
+        try:
+            df = pd.read_csv(csv_path, engine='pyarrow', **read_options)
+        except ImportError:
+            # pyarrow not installed, use the default parser
+            df = pd.read_csv(csv_path, **read_options)
         
-        return f"{size}_{voltage}_{material}_{insulation}"
+        return df.rename(columns=CSV_COLUMNS)
     
-    def process_cable_row(self, row):
-        """Process individual cable row and calculate thermal parameters"""
+    def get_column(self, df, column, default):
+        """Get a CSV column as strings, or a constant column if it is missing"""
+        if column in df:
+            return df[column].fillna(default).astype(str)
+        return pd.Series(default, index=df.index, dtype=str)
+    
+    def create_cable_ids(self, cable_size, voltage, material, insulation):
+        """Create unique cable identifiers"""
+        size = cable_size.str.replace(' ', '_', regex=False).str.replace('/', '_', regex=False)
+        voltage = voltage.str.replace(' ', '_', regex=False).str.replace('/', '_', regex=False)
+        
+        return size + '_' + voltage + '_' + material + '_' + insulation
+    
+    def process_cable_row(self, cable_size, voltage, material, insulation, conductor_area,
+                          conductor_diameter, insulation_thickness, max_temp):
+        """Build the cable data structure from precomputed row values"""
         try:
-            # Extract basic cable information
-            cable_size = str(row.get('cable_size', ''))
-            voltage = str(row.get('voltage', ''))
-            material = str(row.get('material', 'CU'))
-            insulation = str(row.get('insul_material', 'XLPE'))
-            
-            # Calculate conductor area and diameter
-            conductor_area = self.calculate_conductor_area(cable_size)
-            conductor_diameter = self.calculate_conductor_diameter(conductor_area)
-            
-            # Estimate insulation thickness based on voltage
-            insulation_thickness = self.estimate_insulation_thickness(voltage)
-            
             # Estimate sheath thickness
             sheath_thickness = 2.0  # mm, typical
             
-            # Get temperature limits
-            max_temp = self.get_temperature_limit(insulation)
-            
             # Create cable data structure
-            cable_data = {
-                'name': f"{cable_size} {voltage} {material} {insulation}",
-                'description': f"{cable_size} {material} conductor, {insulation} insulation, {voltage}",
-                'cable_size': cable_size,
-                'voltage': voltage,
-                'conductor_material': material,
-                'insulation_type': insulation,
-                'conductor_area': conductor_area,
-                'conductor_diameter': conductor_diameter,
-                'insulation_thickness': insulation_thickness,
-                'sheath_thickness': sheath_thickness,
-                'max_temp': max_temp,
-                'geometry': CableGeometry(conductor_diameter, insulation_thickness, sheath_thickness),
-                'materials': MaterialProperties(material)
-            }
+            cable_data = CableRecord(
+                name=f"{cable_size} {voltage} {material} {insulation}",
+                description=f"{cable_size} {material} conductor, {insulation} insulation, {voltage}",
+                cable_size=cable_size,
+                voltage=voltage,
+                conductor_material=material,
+                insulation_type=insulation,
+                conductor_area=conductor_area,
+                conductor_diameter=conductor_diameter,
+                insulation_thickness=insulation_thickness,
+                sheath_thickness=sheath_thickness,
+                max_temp=max_temp,
+                geometry=self.get_geometry(conductor_diameter, insulation_thickness, sheath_thickness),
+                materials=self.get_materials(material)
+            )
             
             return cable_data
             
@@ -94,21 +208,52 @@ class CableLibrary:
             print(f"Error processing cable: {e}")
             return None
     
+    def get_materials(self, material):
+        """Get the shared material properties for a conductor material"""
+        materials = self._material_cache.get(material)
+        if materials is None:
+            materials = self._material_cache[material] = MaterialProperties(material)
+        return materials
+    
+    def get_geometry(self, conductor_diameter, insulation_thickness, sheath_thickness):
+        """Get a shared cable geometry, cables with the same dimensions reuse one instance"""
+        key = (round(conductor_diameter, 6), round(insulation_thickness, 6), round(sheath_thickness, 6))
+        geometry = self._geometry_cache.get(key)
+        if geometry is None:
+            geometry = self._geometry_cache[key] = CableGeometry(conductor_diameter, insulation_thickness,
+                                                                 sheath_thickness)
+        return geometry
+    
+    def calculate_conductor_areas(self, cable_size):
+        """Calculate conductor areas for a column of cable size designations"""
+        # Only the distinct designations need parsing
+        for size in cable_size.unique():
+            self.calculate_conductor_area(size)
+        return cable_size.map(_AREA_CACHE).to_numpy(dtype=float)
+    
+    def estimate_insulation_thicknesses(self, voltage):
+        """Estimate insulation thicknesses for a column of voltage levels"""
+        # Only the distinct voltage levels need parsing
+        for level in voltage.unique():
+            self.estimate_insulation_thickness(level)
+        return voltage.map(_INSULATION_CACHE).to_numpy(dtype=float)
+    
     def calculate_conductor_area(self, cable_size):
         """Calculate conductor area from cable size designation"""
+        area = _AREA_CACHE.get(cable_size)
+        if area is None:
+            area = _AREA_CACHE[cable_size] = self.parse_conductor_area(cable_size)
+        return area
+    
+    def parse_conductor_area(self, cable_size):
+        """Parse conductor area from cable size designation"""
         try:
             if 'MCM' in cable_size:
                 # Extract MCM value
                 mcm_str = cable_size.split()[0]
                 if '/' in mcm_str:
                     # Handle AWG sizes like 4/0, 2/0, 1/0
-                    awg_map = {
-                        '4/0': 211.6,
-                        '3/0': 167.8,
-                        '2/0': 133.1,
-                        '1/0': 105.6
-                    }
-                    mcm_value = awg_map.get(mcm_str, 105.6)
+                    mcm_value = AWG_TO_MCM.get(mcm_str, 105.6)
                 else:
                     mcm_value = float(mcm_str)
                 
@@ -117,7 +262,7 @@ class CableLibrary:
             else:
                 # Default for non-MCM cables
                 return 100.0
-        except:
+        except (ValueError, IndexError, TypeError):
             return 100.0
     
     def calculate_conductor_diameter(self, area_mm2):
@@ -126,6 +271,13 @@ class CableLibrary:
     
     def estimate_insulation_thickness(self, voltage):
         """Estimate insulation thickness based on voltage level"""
+        thickness = _INSULATION_CACHE.get(voltage)
+        if thickness is None:
+            thickness = _INSULATION_CACHE[voltage] = self.parse_insulation_thickness(voltage)
+        return thickness
+    
+    def parse_insulation_thickness(self, voltage):
+        """Parse voltage level and look up the insulation thickness"""
         try:
             voltage_num = float(''.join(filter(str.isdigit, str(voltage))))
             if voltage_num <= 1:
@@ -140,80 +292,70 @@ class CableLibrary:
                 return 8.0  # mm
             else:
                 return 10.0  # mm
-        except:
+        except ValueError:
             return 4.5  # mm, default
     
     def get_temperature_limit(self, insulation):
         """Get maximum operating temperature for insulation type"""
-        temp_limits = {
-            'XLPE': 90.0,
-            'EPR': 90.0,
-            'Paper': 80.0,
-            'PILC': 85.0,
-            'PVC': 70.0
-        }
-        return temp_limits.get(insulation, 90.0)
+        return TEMPERATURE_LIMITS.get(insulation, 90.0)
     
     def load_default_cables(self):
         """Load default cables if CSV loading fails"""
         default_cables = {
-            '1000_MCM_15_KV_CU_XLPE': {
-                'name': '1000 MCM 15 KV CU XLPE',
-                'description': '1000 MCM CU conductor, XLPE insulation, 15 KV',
-                'cable_size': '1000 MCM',
-                'voltage': '15 KV',
-                'conductor_material': 'CU',
-                'insulation_type': 'XLPE',
-                'conductor_area': 506.7,
-                'conductor_diameter': 25.4,
-                'insulation_thickness': 4.5,
-                'sheath_thickness': 2.0,
-                'max_temp': 90.0,
-                'geometry': CableGeometry(25.4, 4.5, 2.0),
-                'materials': MaterialProperties('CU')
-            },
-            '750_MCM_12_KV_CU_Paper': {
-                'name': '750 MCM 12 KV CU Paper',
-                'description': '750 MCM CU conductor, Paper insulation, 12 KV',
-                'cable_size': '750 MCM',
-                'voltage': '12 KV',
-                'conductor_material': 'CU',
-                'insulation_type': 'Paper',
-                'conductor_area': 380.0,
-                'conductor_diameter': 22.0,
-                'insulation_thickness': 4.0,
-                'sheath_thickness': 2.0,
-                'max_temp': 80.0,
-                'geometry': CableGeometry(22.0, 4.0, 2.0),
-                'materials': MaterialProperties('CU')
-            }
+            '1000_MCM_15_KV_CU_XLPE': CableRecord(
+                name='1000 MCM 15 KV CU XLPE',
+                description='1000 MCM CU conductor, XLPE insulation, 15 KV',
+                cable_size='1000 MCM',
+                voltage='15 KV',
+                conductor_material='CU',
+                insulation_type='XLPE',
+                conductor_area=506.7,
+                conductor_diameter=25.4,
+                insulation_thickness=4.5,
+                sheath_thickness=2.0,
+                max_temp=90.0,
+                geometry=self.get_geometry(25.4, 4.5, 2.0),
+                materials=self.get_materials('CU')
+            ),
+            '750_MCM_12_KV_CU_Paper': CableRecord(
+                name='750 MCM 12 KV CU Paper',
+                description='750 MCM CU conductor, Paper insulation, 12 KV',
+                cable_size='750 MCM',
+                voltage='12 KV',
+                conductor_material='CU',
+                insulation_type='Paper',
+                conductor_area=380.0,
+                conductor_diameter=22.0,
+                insulation_thickness=4.0,
+                sheath_thickness=2.0,
+                max_temp=80.0,
+                geometry=self.get_geometry(22.0, 4.0, 2.0),
+                materials=self.get_materials('CU')
+            )
         }
         self.cables.update(default_cables)
     
     def get_cable_types(self):
         """Get list of available cable types"""
-        cable_types = []
-        for cable_id, cable_data in self.cables.items():
-            cable_types.append({
-                'id': cable_id,
-                'name': cable_data['name'],
-                'description': cable_data['description'],
-                'voltage': cable_data['voltage'],
-                'conductor_material': cable_data['conductor_material'],
-                'insulation_type': cable_data['insulation_type'],
-                'max_temp': cable_data['max_temp']
-            })
-        return cable_types
+        self.wait_until_loaded()
+        return self._cable_types_cache
+    
+    def get_cable_types_json(self):
+        """Get the serialized cable types response body"""
+        self.wait_until_loaded()
+        return self._cable_types_json
     
     def get_thermal_parameters(self, cable_id):
         """Get thermal parameters for a specific cable"""
+        self.wait_until_loaded()
         cable_data = self.cables.get(cable_id)
         if cable_data:
-            return cable_data['geometry'], cable_data['materials']
+            return cable_data.geometry, cable_data.materials
         return None, None
     
     def get_cable_data(self, cable_id):
         """Get complete cable data"""
+        self.wait_until_loaded()
         return self.cables.get(cable_id)
 
 # Global cable library instance
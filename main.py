@@ -5,6 +5,10 @@ Emergency Rating Calculator - Main Flask Application
 IEC 60853-2 Compliant Underground Cable Thermal Analysis
 """
 
+# Patch the standard library for cooperative I/O before anything else is imported
+import eventlet
+eventlet.monkey_patch()
+
 import os
 import sys
 # DON'T CHANGE THIS !!!
@@ -15,10 +19,10 @@ from flask_cors import CORS
 from flask_socketio import SocketIO
 
 # Import thermal routes
-from routes.thermal import thermal_bp
+from routes.thermal import thermal_bp, start_warmup
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-socketio = SocketIO(app)
+socketio = SocketIO(app, async_mode='eventlet')
 
 #app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'emergency_rating_calculator_secret_key'
@@ -29,6 +33,9 @@ CORS(app)
 # Register thermal calculation blueprint
 app.register_blueprint(thermal_bp, url_prefix='/api/thermal')
 
+# Warm up calculators in the background so the server starts promptly
+start_warmup()
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -54,6 +61,6 @@ if __name__ == '__main__':
     print("Available at: http://localhost:5000")
     print("API endpoints at: http://localhost:5000/api/thermal/")
 
-    socketio.run(app, debug=False, port=5000, allow_unsafe_werkzeug=True) # Starts the server
+    socketio.run(app, host='0.0.0.0', port=5000) # Starts the server
     #app.run(host='0.0.0.0', port=5555, debug=True)
 
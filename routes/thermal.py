@@ -5,16 +5,35 @@ Thermal Calculation Routes
 API endpoints for emergency rating calculations
 """
 
-from flask import Blueprint, request, jsonify
+from functools import lru_cache
+import sys
+import threading
+from flask import Blueprint, request, jsonify, current_app
 import numpy as np
-from thermal_engine import ThermalNetwork, EmergencyRatingCalculator, RadialTemperatureCalculator
+import orjson
+try:
+    import ormsgpack
+except ImportError:
+    # msgpack responses are optional, JSON is always available
+    ormsgpack = None
+from thermal_engine import (ThermalNetwork, EmergencyRatingCalculator, RadialTemperatureCalculator,
+                            warm_up_kernels, HAVE_NUMBA)
 from cable_library import get_cable_library
 
 thermal_bp = Blueprint('thermal', __name__)
 
+# Fixed error responses, serialized once
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+_ERR_NO_CABLE_TYPE = (orjson.dumps({'error': 'Cable type is required'}), 400, _JSON_HEADERS)
+_ERR_CABLE_NOT_FOUND = (orjson.dumps({'error': 'Cable type not found'}), 404, _JSON_HEADERS)
+_ERR_NO_CABLE_PARAMETERS = (orjson.dumps({'error': 'Unable to get cable parameters'}), 500, _JSON_HEADERS)
+
 # Initialize cable library
 cable_lib = get_cable_library()
 
+# Set once the warm-up has finished, or failed, when serving under eventlet
+_warmup_done = None
+
 def get_cable_thermal_parameters(cable_type):
     """Helper function to get cable thermal parameters"""
     try:
@@ -25,6 +44,145 @@ def get_cable_thermal_parameters(cable_type):
         print(f"Error getting cable parameters: {e}")
         return None, None, None
 
+class ThermalRequest:
+    """Thermal calculation request parameters, parsed once from the JSON body"""
+    __slots__ = ('cable_type', 'current', 'initial_current', 'emergency_current', 'emergency_duration',
+                 'duration_hours', 'max_temperature', 'ambient_temperature', 'radial_points')
+    
+    def __init__(self, cable_type=None, current=0, initial_current=0, emergency_current=0,
+                 emergency_duration=6, duration_hours=6, max_temperature=90,
+                 ambient_temperature=20, radial_points=50):
+        self.cable_type = cable_type
+        self.current = float(current)
+        self.initial_current = float(initial_current)
+        self.emergency_current = float(emergency_current)
+        self.emergency_duration = float(emergency_duration)
+        self.duration_hours = float(duration_hours)
+        self.max_temperature = float(max_temperature)
+        self.ambient_temperature = float(ambient_temperature)
+        self.radial_points = int(radial_points)
+    
+    @classmethod
+    def from_json(cls, data):
+        """Build from a parsed JSON body, ignoring unknown fields"""
+        data = data or {}
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+def _under_eventlet():
+    """Check whether the standard library has been patched for eventlet"""
+    # Only look at eventlet if the application already loaded it
+    return 'eventlet' in sys.modules and sys.modules['eventlet'].patcher.is_monkey_patched('thread')
+
+def _offload(func, *args, **kwargs):
+    """Run a blocking or CPU-bound call on the calculation thread when serving under eventlet"""
+    # Green threads only switch on I/O, so computing on the hub would stall every other request
+    if _under_eventlet():
+        from eventlet import tpool
+        
+        # Kernels are only compiled during the warm-up, on the calculation thread
+        if _warmup_done is not None:
+            _warmup_done.wait()
+        return tpool.execute(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+def _when_loaded(func, *args):
+    """Run a cable library lookup once the library has loaded, without waiting for the warm-up"""
+    if _under_eventlet():
+        import eventlet
+        
+        # The loader is a real OS thread, joining it on the hub would stall every other request
+        while not cable_lib.is_loaded():
+            eventlet.sleep(0.05)
+    return func(*args)
+
+def _json(obj):
+    """Serialize a response with orjson, passing NumPy arrays through natively"""
+    return current_app.response_class(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+                                      mimetype='application/json')
+
+def _profile_response(obj):
+    """Serialize a profile response as msgpack if the client asks for it, else as compact JSON"""
+    if ormsgpack is not None and request.accept_mimetypes.best_match(
+            ['application/json', 'application/msgpack']) == 'application/msgpack':
+        response = current_app.response_class(ormsgpack.packb(obj, option=ormsgpack.OPT_SERIALIZE_NUMPY),
+                                              mimetype='application/msgpack')
+    else:
+        # Profiles don't need more than 3 decimals, which roughly halves the JSON payload
+        response = _json({key: np.round(value, 3) if isinstance(value, np.ndarray) else value
+                          for key, value in obj.items()})
+    
+    # The body format depends on Accept, so caches must not share it across clients
+    response.vary.add('Accept')
+    return response
+
+def _get_calculators(cable_type):
+    """Get the cached thermal network and calculators for a cable type, None if it is unknown"""
+    # Only known cable types reach the cache, so arbitrary ids can't evict real calculators
+    if cable_lib.get_cable_data(cable_type) is None:
+        return None
+    return _build_calculators(cable_type)
+
+@lru_cache(maxsize=512)
+def _build_calculators(cable_type):
+    """Build the thermal network and calculators for a cable type once and reuse them"""
+    geometry, materials, cable_data = get_cable_thermal_parameters(cable_type)
+    if not geometry or not materials or not cable_data:
+        return None
+    
+    thermal_network = ThermalNetwork(geometry, materials)
+    return (geometry, materials, cable_data, thermal_network,
+            EmergencyRatingCalculator(thermal_network, cable_data.conductor_area),
+            RadialTemperatureCalculator(thermal_network))
+
+def start_warmup():
+    """Run the warm-up in the background without holding up the server"""
+    global _warmup_done
+    if HAVE_NUMBA:
+        import numba
+        
+        # Parallel kernels then run on the warm-up and request threads; TBB hangs at interpreter exit after that
+        numba.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+    
+    if _under_eventlet():
+        import eventlet
+        from eventlet import event, tpool
+        
+        # Once patched, Numba's compiler lock is a green lock that breaks when contended across
+        # OS threads, so all calculations share a single pool thread, starting with the warm-up
+        tpool.set_num_threads(1)
+        _warmup_done = event.Event()
+        eventlet.spawn(_green_warmup)
+    else:
+        threading.Thread(target=_warmup, daemon=True).start()
+
+def _green_warmup():
+    """Run the warm-up on the calculation thread and open the gate however it ends"""
+    from eventlet import tpool
+    try:
+        tpool.execute(_warmup)
+    except Exception as e:
+        print(f"Error during warm-up: {e}")
+    finally:
+        _warmup_done.send()
+
+def _warmup():
+    """Load the compiled kernels and build the calculators for every cable type"""
+    try:
+        warm_up_kernels()
+    except Exception as e:
+        print(f"Error warming up kernels: {e}")
+    
+    cable_lib.wait_until_loaded()
+    for cable_id in list(cable_lib.cables.keys()):
+        # A broken cable only loses its warm-up, requests for it report the error themselves
+        try:
+            calculators = _get_calculators(cable_id)
+            if calculators is not None:
+                cable_data, calculator = calculators[2], calculators[4]
+                calculator.calculate_steady_state_temperature(0, 20, cable_data.conductor_area)
+        except Exception as e:
+            print(f"Error warming up cable {cable_id}: {e}")
+
 @thermal_bp.route('/health')
 def health_check():
     """Health check endpoint"""
@@ -38,8 +196,8 @@ def health_check():
 def get_cable_types():
     """Get available cable types"""
     try:
-        cable_types = cable_lib.get_cable_types()
-        return jsonify({'cable_types': cable_types})
+        return current_app.response_class(_when_loaded(cable_lib.get_cable_types_json),
+                                          mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -47,20 +205,20 @@ def get_cable_types():
 def get_cable_parameters(cable_type):
     """Get parameters for a specific cable type"""
     try:
-        cable_data = cable_lib.get_cable_data(cable_type)
+        cable_data = _when_loaded(cable_lib.get_cable_data, cable_type)
         if not cable_data:
-            return jsonify({'error': 'Cable type not found'}), 404
+            return _ERR_CABLE_NOT_FOUND
         
         # Return relevant parameters
         parameters = {
-            'name': cable_data['name'],
-            'description': cable_data['description'],
-            'conductor_area': cable_data['conductor_area'],
-            'conductor_diameter': cable_data['conductor_diameter'],
-            'insulation_thickness': cable_data['insulation_thickness'],
-            'max_temperature': cable_data['max_temp'],
-            'conductor_material': cable_data['conductor_material'],
-            'insulation_type': cable_data['insulation_type']
+            'name': cable_data.name,
+            'description': cable_data.description,
+            'conductor_area': cable_data.conductor_area,
+            'conductor_diameter': cable_data.conductor_diameter,
+            'insulation_thickness': cable_data.insulation_thickness,
+            'max_temperature': cable_data.max_temp,
+            'conductor_material': cable_data.conductor_material,
+            'insulation_type': cable_data.insulation_type
         }
         
         return jsonify(parameters)
@@ -70,54 +228,44 @@ def get_cable_parameters(cable_type):
 @thermal_bp.route('/emergency-rating', methods=['POST'])
 def calculate_emergency_rating():
     """Calculate emergency current rating"""
-    data = request.get_json()
+    # Malformed or non-JSON bodies are rejected by Flask with 400/415, not caught below
+    data = request.get_json(cache=True)
     
     try:
-        # Extract parameters
-        cable_type = data.get('cable_type')
-        initial_current = float(data.get('initial_current', 0))
-        emergency_duration = float(data.get('emergency_duration', 6))
-        max_temperature = float(data.get('max_temperature', 90))
-        ambient_temperature = float(data.get('ambient_temperature', 20))
+        # Parse request parameters
+        req = ThermalRequest.from_json(data)
         
-        if not cable_type:
-            return jsonify({'error': 'Cable type is required'}), 400
+        if not req.cable_type:
+            return _ERR_NO_CABLE_TYPE
         
-        # Get cable parameters
-        geometry, materials, cable_data = get_cable_thermal_parameters(cable_type)
+        # Get cached cable parameters and calculator
+        calculators = _offload(_get_calculators, req.cable_type)
         
-        if not geometry or not materials or not cable_data:
-            return jsonify({'error': 'Unable to get cable parameters'}), 500
+        if calculators is None:
+            return _ERR_NO_CABLE_PARAMETERS
         
-        # Create thermal network and calculator
-        thermal_network = ThermalNetwork(geometry, materials)
-        calculator = EmergencyRatingCalculator(thermal_network)
+        geometry, materials, cable_data, thermal_network, calculator, _ = calculators
         
         # Get conductor area
-        conductor_area = cable_data['conductor_area']
-        
-        # Calculate emergency rating
-        emergency_current = calculator.calculate_emergency_current(
-            initial_current, emergency_duration, max_temperature, 
-            ambient_temperature, conductor_area
-        )
+        conductor_area = cable_data.conductor_area
         
-        # Calculate initial temperature
-        initial_temp = calculator.calculate_steady_state_temperature(
-            initial_current, ambient_temperature, conductor_area
+        # Calculate emergency rating and initial temperature
+        emergency_current, initial_temp, _ = _offload(
+            calculator.calculate_emergency_current, req.initial_current, req.emergency_duration,
+            req.max_temperature, req.ambient_temperature, conductor_area, full_output=True
         )
         
         # Calculate scaling factor
-        scaling_factor = emergency_current / initial_current if initial_current > 0 else 0
+        scaling_factor = emergency_current / req.initial_current if req.initial_current > 0 else 0
         
         # Check IEC compliance (≤2.5× scaling factor)
         within_iec_limit = scaling_factor <= 2.5
         
         response = {
             'emergency_current': round(emergency_current, 1),
-            'initial_current': initial_current,
-            'emergency_duration': emergency_duration,
-            'max_temperature': max_temperature,
+            'initial_current': req.initial_current,
+            'emergency_duration': req.emergency_duration,
+            'max_temperature': req.max_temperature,
             'initial_temperature': round(initial_temp, 2),
             'scaling_factor': round(scaling_factor, 2),
             'within_iec_limit': within_iec_limit
@@ -131,44 +279,41 @@ def calculate_emergency_rating():
 @thermal_bp.route('/steady-state-temperature', methods=['POST'])
 def calculate_steady_state_temperature():
     """Calculate steady-state conductor temperature"""
-    data = request.get_json()
+    # Malformed or non-JSON bodies are rejected by Flask with 400/415, not caught below
+    data = request.get_json(cache=True)
     
     try:
-        # Extract parameters
-        cable_type = data.get('cable_type')
-        current = float(data.get('current', 0))
-        ambient_temperature = float(data.get('ambient_temperature', 20))
+        # Parse request parameters
+        req = ThermalRequest.from_json(data)
         
-        if not cable_type:
-            return jsonify({'error': 'Cable type is required'}), 400
+        if not req.cable_type:
+            return _ERR_NO_CABLE_TYPE
         
-        # Get cable parameters
-        geometry, materials, cable_data = get_cable_thermal_parameters(cable_type)
+        # Get cached cable parameters and calculator
+        calculators = _offload(_get_calculators, req.cable_type)
         
-        if not geometry or not materials or not cable_data:
-            return jsonify({'error': 'Unable to get cable parameters'}), 500
+        if calculators is None:
+            return _ERR_NO_CABLE_PARAMETERS
         
-        # Create thermal network and calculator
-        thermal_network = ThermalNetwork(geometry, materials)
-        calculator = EmergencyRatingCalculator(thermal_network)
+        geometry, materials, cable_data, thermal_network, calculator, _ = calculators
         
         # Get conductor area
-        conductor_area = cable_data['conductor_area']
+        conductor_area = cable_data.conductor_area
         
         # Calculate temperature and losses
-        conductor_temp = calculator.calculate_steady_state_temperature(
-            current, ambient_temperature, conductor_area
+        conductor_temp = _offload(
+            calculator.calculate_steady_state_temperature, req.current, req.ambient_temperature, conductor_area
         )
         conductor_losses = calculator.calculate_conductor_losses(
-            current, conductor_temp, conductor_area
+            req.current, conductor_temp, conductor_area
         )
         
         response = {
             'conductor_temperature': round(conductor_temp, 2),
-            'temperature_rise': round(conductor_temp - ambient_temperature, 2),
+            'temperature_rise': round(conductor_temp - req.ambient_temperature, 2),
             'conductor_losses': round(conductor_losses, 2),
-            'current': current,
-            'ambient_temperature': ambient_temperature
+            'current': req.current,
+            'ambient_temperature': req.ambient_temperature
         }
         
         return jsonify(response)
@@ -179,49 +324,45 @@ def calculate_steady_state_temperature():
 @thermal_bp.route('/transient-analysis', methods=['POST'])
 def calculate_transient_analysis():
     """Calculate transient thermal analysis"""
-    data = request.get_json()
+    # Malformed or non-JSON bodies are rejected by Flask with 400/415, not caught below
+    data = request.get_json(cache=True)
     
     try:
-        # Extract parameters
-        cable_type = data.get('cable_type')
-        initial_current = float(data.get('initial_current', 0))
-        emergency_current = float(data.get('emergency_current', 0))
-        duration_hours = float(data.get('duration_hours', 6))
-        ambient_temperature = float(data.get('ambient_temperature', 20))
+        # Parse request parameters
+        req = ThermalRequest.from_json(data)
         
-        if not cable_type:
-            return jsonify({'error': 'Cable type is required'}), 400
+        if not req.cable_type:
+            return _ERR_NO_CABLE_TYPE
         
-        # Get cable parameters
-        geometry, materials, cable_data = get_cable_thermal_parameters(cable_type)
+        # Get cached cable parameters and calculator
+        calculators = _offload(_get_calculators, req.cable_type)
         
-        if not geometry or not materials or not cable_data:
-            return jsonify({'error': 'Unable to get cable parameters'}), 500
+        if calculators is None:
+            return _ERR_NO_CABLE_PARAMETERS
         
-        # Create thermal network and calculator
-        thermal_network = ThermalNetwork(geometry, materials)
-        calculator = EmergencyRatingCalculator(thermal_network)
+        geometry, materials, cable_data, thermal_network, calculator, _ = calculators
         
         # Get conductor area
-        conductor_area = cable_data['conductor_area']
+        conductor_area = cable_data.conductor_area
         
         # Calculate transient temperature profile
-        time_hours, temperature_celsius = calculator.calculate_transient_temperature(
-            initial_current, emergency_current, duration_hours, 
-            ambient_temperature, conductor_area
-        )
+        time_hours, temperature_celsius, max_temperature, final_temperature = \
+            _offload(
+                calculator.calculate_transient_temperature, req.initial_current, req.emergency_current,
+                req.duration_hours, req.ambient_temperature, conductor_area, full_output=True
+            )
         
         response = {
-            'time_hours': time_hours.tolist(),
-            'temperature_celsius': temperature_celsius.tolist(),
-            'initial_current': initial_current,
-            'emergency_current': emergency_current,
-            'duration_hours': duration_hours,
-            'max_temperature': round(float(np.max(temperature_celsius)), 2),
-            'final_temperature': round(float(temperature_celsius[-1]), 2)
+            'time_hours': time_hours,
+            'temperature_celsius': temperature_celsius,
+            'initial_current': req.initial_current,
+            'emergency_current': req.emergency_current,
+            'duration_hours': req.duration_hours,
+            'max_temperature': round(max_temperature, 2),
+            'final_temperature': round(final_temperature, 2)
         }
         
-        return jsonify(response)
+        return _profile_response(response)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -229,34 +370,31 @@ def calculate_transient_analysis():
 @thermal_bp.route('/radial-temperature', methods=['POST'])
 def calculate_radial_temperature():
     """Calculate radial temperature distribution"""
-    data = request.get_json()
+    # Malformed or non-JSON bodies are rejected by Flask with 400/415, not caught below
+    data = request.get_json(cache=True)
     
     try:
-        # Extract parameters
-        cable_type = data.get('cable_type')
-        current = float(data.get('current', 0))
-        ambient_temperature = float(data.get('ambient_temperature', 20))
-        radial_points = int(data.get('radial_points', 50))
+        # Parse request parameters
+        req = ThermalRequest.from_json(data)
         
-        if not cable_type:
-            return jsonify({'error': 'Cable type is required'}), 400
+        if not req.cable_type:
+            return _ERR_NO_CABLE_TYPE
         
-        # Get cable parameters
-        geometry, materials, cable_data = get_cable_thermal_parameters(cable_type)
+        # Get cached cable parameters and calculator
+        calculators = _offload(_get_calculators, req.cable_type)
         
-        if not geometry or not materials or not cable_data:
-            return jsonify({'error': 'Unable to get cable parameters'}), 500
+        if calculators is None:
+            return _ERR_NO_CABLE_PARAMETERS
         
-        # Create thermal network and calculator
-        thermal_network = ThermalNetwork(geometry, materials)
-        radial_calculator = RadialTemperatureCalculator(thermal_network)
+        geometry, materials, cable_data, thermal_network, _, radial_calculator = calculators
         
         # Get conductor area
-        conductor_area = cable_data['conductor_area']
+        conductor_area = cable_data.conductor_area
         
         # Calculate radial temperature profile
-        radius_mm, temperature_celsius = radial_calculator.calculate_radial_profile(
-            current, ambient_temperature, conductor_area, radial_points
+        radius_mm, temperature_celsius = _offload(
+            radial_calculator.calculate_radial_profile, req.current, req.ambient_temperature,
+            conductor_area, req.radial_points
         )
         
         # Get cable boundaries
@@ -267,16 +405,16 @@ def calculate_radial_temperature():
         }
         
         response = {
-            'radius_mm': radius_mm.tolist(),
-            'temperature_celsius': temperature_celsius.tolist(),
-            'current': current,
-            'ambient_temperature': ambient_temperature,
+            'radius_mm': radius_mm,
+            'temperature_celsius': temperature_celsius,
+            'current': req.current,
+            'ambient_temperature': req.ambient_temperature,
             'cable_boundaries': cable_boundaries,
             'max_temperature': round(float(np.max(temperature_celsius)), 2),
             'conductor_temperature': round(float(temperature_celsius[0]), 2)
         }
         
-        return jsonify(response)
+        return _profile_response(response)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -6,8 +6,32 @@ IEC 60853-2 Compliant Underground Cable Thermal Analysis
 """
 
 import numpy as np
-import scipy.optimize as opt
 import math
+import multiprocessing
+import os
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional, the kernels below then run as plain Python
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    
+    prange = range
+
+# Conductor to insulation inner surface thermal resistance, negligible for solid conductors
+R_CI = 0.0  # K.m/W
+
+# Maximum number of memoized steady-state results per calculator
+STEADY_STATE_CACHE_SIZE = 4096
+
+# Rating arguments that Monte Carlo runs can sample, besides burial_depth_mm and MaterialProperties attributes
+MONTE_CARLO_RATING_PARAMETERS = ('initial_current', 'emergency_duration', 'max_temp', 'ambient_temp', 'conductor_area')
 
 class CableGeometry:
     """Cable geometry parameters"""
@@ -51,99 +75,311 @@ class MaterialProperties:
         self.soil_density = 1800  # kg/m³
         self.soil_specific_heat = 1800  # J/kg.K
 
+@njit(cache=True)
+def _steady_state_temperature_kernel(current, ambient_temp, R_20, R_total, alpha):
+    """Solve T = T_amb + I²·R₂₀·[1 + α(T - 20)]·R_total for T in closed form"""
+    # T is linear in itself: T·(1 - a·α) = T_amb + a·(1 - 20α) with a = I²·R₂₀·R_total
+    a = current * current * R_20 * R_total
+    denominator = 1.0 - a * alpha
+    if denominator <= 0.0:
+        # Thermal runaway, losses grow faster than the cable can shed heat
+        return math.inf
+    return (ambient_temp + a * (1.0 - 20.0 * alpha)) / denominator
+
+def _steady_state_temperature_array(current, ambient_temp, R_20, R_total, alpha):
+    """Closed-form steady-state temperature broadcast over arrays, inf on thermal runaway"""
+    a = np.square(current) * R_20 * R_total
+    denominator = 1.0 - a * alpha
+    with np.errstate(divide='ignore', invalid='ignore'):
+        conductor_temp = (ambient_temp + a * (1.0 - 20.0 * alpha)) / denominator
+    return np.where(denominator > 0.0, conductor_temp, np.inf)
+
+@njit(cache=True)
+def _emergency_current_kernel(initial_temp, max_temp, ambient_temp, decay, R_20, R_total, alpha):
+    """Invert θ_i + (θ_ss(I) - θ_i)·decay = θ_max for I in closed form"""
+    if decay <= 0.0:
+        return math.nan
+    
+    # Steady-state temperature the emergency current has to be heading for
+    target_temp = initial_temp + (max_temp - initial_temp) / decay
+    
+    # θ_ss = θ_amb + I²·R₂₀·[1 + α(θ_ss - 20)]·R_total, solved for I²
+    current_squared = (target_temp - ambient_temp) / (R_20 * R_total * (1.0 + alpha * (target_temp - 20.0)))
+    if current_squared < 0.0:
+        return math.nan
+    return math.sqrt(current_squared)
+
+@njit(parallel=True, cache=True)
+def _steady_state_temperature_batch_kernel(currents, ambient_temp, R_20, R_total, alpha):
+    """Closed-form steady-state temperature for each current, evaluated in parallel"""
+    conductor_temp = np.empty_like(currents)
+    for i in prange(currents.shape[0]):
+        conductor_temp[i] = _steady_state_temperature_kernel(currents[i], ambient_temp, R_20, R_total, alpha)
+    return conductor_temp
+
+# Without Numba the batch kernel is a Python loop, so use the NumPy version instead
+_steady_state_temperature_batch = (_steady_state_temperature_batch_kernel if HAVE_NUMBA
+                                   else _steady_state_temperature_array)
+
+def _steady_state_temperature_scalar(current, ambient_temp, R_20, R_total, alpha):
+    """Closed-form steady-state temperature for scalars, with the simplified fallback on thermal runaway"""
+    conductor_temp = _steady_state_temperature_kernel(current, ambient_temp, R_20, R_total, alpha)
+    if not math.isfinite(conductor_temp):
+        # Fallback calculation
+        losses_approx = current ** 2 * R_20
+        return ambient_temp + losses_approx * R_total
+    return float(conductor_temp)
+
+def _emergency_current_scalar(initial_current, initial_temp, max_temp, ambient_temp, decay, R_20, R_total, alpha):
+    """Closed-form emergency current for scalars, with the simplified fallback where there is no solution"""
+    emergency_current = _emergency_current_kernel(initial_temp, max_temp, ambient_temp, decay, R_20, R_total, alpha)
+    if math.isfinite(emergency_current):
+        return float(emergency_current)
+    
+    if decay <= 0.0 or initial_temp == ambient_temp:
+        # No emergency time or no temperature rise to scale, keep the initial loading
+        return float(initial_current)
+    
+    # Fallback simplified calculation
+    temp_ratio = (max_temp - ambient_temp) / (initial_temp - ambient_temp)
+    return initial_current * math.sqrt(max(temp_ratio, 0.1))
+
+def _emergency_current_array(initial_temp, max_temp, ambient_temp, decay, R_20, R_total, alpha):
+    """Closed-form emergency current broadcast over arrays, NaN where there is no solution"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        target_temp = initial_temp + (max_temp - initial_temp) / decay
+        current_squared = (target_temp - ambient_temp) / (R_20 * R_total * (1.0 + alpha * (target_temp - 20.0)))
+    return np.sqrt(np.where((decay > 0.0) & (current_squared >= 0.0), current_squared, np.nan))
+
+@njit(cache=True)
+def _transient_temperature_kernel(time_array, initial_temp, final_temp, tau, out):
+    """Fill out with θ(t) = θ_i + (θ_f - θ_i)·[1 - exp(-t/τ)], tracking the peak and last value"""
+    peak_temp = -math.inf
+    last_temp = math.nan
+    for i in range(time_array.shape[0]):
+        last_temp = initial_temp + (final_temp - initial_temp) * -math.expm1(-time_array[i] / tau)
+        out[i] = last_temp
+        if last_temp > peak_temp:
+            peak_temp = last_temp
+    return out, peak_temp, last_temp
+
+def _transient_temperature_vectorized(time_array, initial_temp, final_temp, tau, out):
+    """Fill out with θ(t) in one vectorized expression, returning the peak and last value"""
+    temperature = initial_temp + (final_temp - initial_temp) * -np.expm1(-time_array / tau)
+    out[:] = temperature
+    if temperature.size == 0:
+        return out, -math.inf, math.nan
+    return out, float(temperature.max()), float(temperature[-1])
+
+# Without Numba the kernel is a Python loop, so use the NumPy version instead
+_transient_temperature = _transient_temperature_kernel if HAVE_NUMBA else _transient_temperature_vectorized
+
+@njit(parallel=True, cache=True)
+def _radial_profile_kernel(radii, conductor_temp, conductor_losses, r_conductor, r_insulation, r_sheath,
+                           R_ins, R_sheath, inv2pi_ins, inv2pi_sheath, inv2pi_soil):
+    """Evaluate the piecewise radial temperature at each radius independently"""
+    temperature = np.empty_like(radii)
+    for i in prange(radii.shape[0]):
+        r = radii[i]
+        if r <= r_conductor:
+            # Inside conductor (uniform temperature)
+            thermal_resistance = 0.0
+        elif r <= r_insulation:
+            # Inside insulation
+            thermal_resistance = inv2pi_ins * math.log(r / r_conductor)
+        elif r <= r_sheath:
+            # Inside sheath
+            thermal_resistance = R_ins + inv2pi_sheath * math.log(r / r_insulation)
+        else:
+            # Outside cable (soil)
+            thermal_resistance = R_ins + R_sheath + inv2pi_soil * math.log(r / r_sheath)
+        temperature[i] = conductor_temp - conductor_losses * thermal_resistance
+    return temperature
+
+def _radial_profile_vectorized(radii, conductor_temp, conductor_losses, r_conductor, r_insulation, r_sheath,
+                               R_ins, R_sheath, inv2pi_ins, inv2pi_sheath, inv2pi_soil):
+    """Evaluate the piecewise radial temperature with one masked expression per region"""
+    in_insulation = (radii > r_conductor) & (radii <= r_insulation)
+    in_sheath = (radii > r_insulation) & (radii <= r_sheath)
+    in_soil = radii > r_sheath
+    
+    # Conductor points keep zero resistance (uniform temperature)
+    thermal_resistance = np.zeros_like(radii)
+    thermal_resistance[in_insulation] = inv2pi_ins * np.log(radii[in_insulation] / r_conductor)
+    thermal_resistance[in_sheath] = R_ins + inv2pi_sheath * np.log(radii[in_sheath] / r_insulation)
+    thermal_resistance[in_soil] = R_ins + R_sheath + inv2pi_soil * np.log(radii[in_soil] / r_sheath)
+    
+    return conductor_temp - conductor_losses * thermal_resistance
+
+# Without Numba the kernel is a Python loop, so use the NumPy version instead
+_radial_profile = _radial_profile_kernel if HAVE_NUMBA else _radial_profile_vectorized
+
 class ThermalNetwork:
     """Thermal network model for cable"""
-    def __init__(self, geometry, materials):
+    def __init__(self, geometry, materials, burial_depth_mm=1000):
         self.geometry = geometry
         self.materials = materials
+        self.burial_depth = burial_depth_mm  # mm
+        self.version = 0
         self.calculate_thermal_resistances()
         self.calculate_thermal_capacitances()
     
     def calculate_thermal_resistances(self):
         """Calculate thermal resistances per unit length"""
-        # Conductor to insulation inner surface
-        self.R_ci = 0  # Negligible for solid conductor
+        # Results cached against this network are stale once it is recalculated
+        self.version += 1
+        
+        # Cylindrical resistance factors 1/(2πk), reused for the radial profile
+        self.inv2pi_ins = 1.0 / (2 * math.pi * self.materials.insulation_thermal_conductivity)
+        self.inv2pi_sheath = 1.0 / (2 * math.pi * self.materials.sheath_thermal_conductivity)
+        self.inv2pi_soil = 1.0 / (2 * math.pi * self.materials.soil_thermal_conductivity)
         
         # Insulation thermal resistance (cylindrical)
-        self.R_ins = (1 / (2 * np.pi * self.materials.insulation_thermal_conductivity)) * \
-                     np.log(self.geometry.insulation_outer_radius / self.geometry.conductor_radius)
+        self.R_ins = self.inv2pi_ins * \
+                     math.log(self.geometry.insulation_outer_radius / self.geometry.conductor_radius)
         
         # Sheath thermal resistance
-        self.R_sheath = (1 / (2 * np.pi * self.materials.sheath_thermal_conductivity)) * \
-                        np.log(self.geometry.sheath_outer_radius / self.geometry.insulation_outer_radius)
+        self.R_sheath = self.inv2pi_sheath * \
+                        math.log(self.geometry.sheath_outer_radius / self.geometry.insulation_outer_radius)
         
         # External thermal resistance (to ambient)
         # Simplified model for buried cable
-        burial_depth = 1000  # mm, typical burial depth
-        self.R_ext = 1 / (2 * np.pi * self.materials.soil_thermal_conductivity) * \
-                     np.log(2 * burial_depth / self.geometry.sheath_outer_radius)
+        self.R_ext = self.inv2pi_soil * \
+                     math.log(2 * self.burial_depth / self.geometry.sheath_outer_radius)
+        
+        # Total thermal resistance, conductor to insulation (R_CI) is negligible
+        self.R_total = self.R_ins + self.R_sheath + self.R_ext
         
-        # Total thermal resistance
-        self.R_total = self.R_ci + self.R_ins + self.R_sheath + self.R_ext
+        # Keep the time constant in step when the resistances are recalculated
+        if hasattr(self, 'C_total'):
+            self.tau = self.C_total * self.R_total
     
     def calculate_thermal_capacitances(self):
         """Calculate thermal capacitances per unit length"""
         # Conductor thermal capacitance
-        conductor_volume = np.pi * (self.geometry.conductor_radius ** 2)  # mm²/m
+        conductor_volume = math.pi * (self.geometry.conductor_radius ** 2)  # mm²/m
         self.C_conductor = (conductor_volume * 1e-6) * self.materials.conductor_density * \
                           self.materials.conductor_specific_heat  # J/m.K
         
         # Insulation thermal capacitance
-        insulation_volume = np.pi * (self.geometry.insulation_outer_radius ** 2 - 
+        insulation_volume = math.pi * (self.geometry.insulation_outer_radius ** 2 - 
                                    self.geometry.conductor_radius ** 2)  # mm²/m
         self.C_insulation = (insulation_volume * 1e-6) * self.materials.insulation_density * \
                            self.materials.insulation_specific_heat  # J/m.K
         
         # Sheath thermal capacitance
-        sheath_volume = np.pi * (self.geometry.sheath_outer_radius ** 2 - 
+        sheath_volume = math.pi * (self.geometry.sheath_outer_radius ** 2 - 
                                self.geometry.insulation_outer_radius ** 2)  # mm²/m
         self.C_sheath = (sheath_volume * 1e-6) * self.materials.sheath_density * \
                        self.materials.sheath_specific_heat  # J/m.K
+        
+        # Total capacitance and thermal time constant
+        self.C_total = self.C_conductor + self.C_insulation + self.C_sheath  # J/m.K
+        self.tau = self.C_total * self.R_total  # seconds
 
 class EmergencyRatingCalculator:
     """Emergency rating calculator based on IEC 60853-2"""
-    def __init__(self, thermal_network):
+    def __init__(self, thermal_network, conductor_area=500):
         self.thermal_network = thermal_network
         self.temperature_coefficient = 0.00393  # 1/K for copper
+        self._steady_state_cache = {}
+        
+        # Sweeps rarely change the area, so precompute R₂₀ for the calculator's own one
+        self.conductor_area = conductor_area  # mm²
+        self.R_20 = thermal_network.materials.conductor_resistivity / conductor_area  # ohm/m
+        self._R_20_version = thermal_network.version
+    
+    def conductor_resistance_20(self, conductor_area=None):
+        """Get conductor resistance at 20°C, precomputed for the calculator's conductor area
+        
+        Like the rest of the network, material changes take effect once the network is recalculated.
+        """
+        if conductor_area is None or conductor_area == self.conductor_area:
+            if self._R_20_version != self.thermal_network.version:
+                self.R_20 = self.thermal_network.materials.conductor_resistivity / self.conductor_area
+                self._R_20_version = self.thermal_network.version
+            return self.R_20
+        return self.thermal_network.materials.conductor_resistivity / conductor_area  # ohm/m
     
-    def calculate_conductor_resistance(self, temperature, conductor_area):
+    def calculate_conductor_resistance(self, temperature, conductor_area=None):
         """Calculate conductor resistance at given temperature"""
         # R(T) = R₂₀ * [1 + α(T - 20)]
-        R_20 = self.thermal_network.materials.conductor_resistivity / conductor_area  # ohm/m
+        R_20 = self.conductor_resistance_20(conductor_area)
         return R_20 * (1 + self.temperature_coefficient * (temperature - 20))
     
-    def calculate_conductor_losses(self, current, conductor_temp, conductor_area):
+    def calculate_conductor_losses(self, current, conductor_temp, conductor_area=None):
         """Calculate conductor losses per unit length"""
         resistance = self.calculate_conductor_resistance(conductor_temp, conductor_area)
         return current ** 2 * resistance  # W/m
     
-    def calculate_steady_state_temperature(self, current, ambient_temp, conductor_area=500):
-        """Calculate steady-state conductor temperature"""
-        def temp_equation(conductor_temp):
-            losses = self.calculate_conductor_losses(current, conductor_temp, conductor_area)
-            calculated_temp = ambient_temp + losses * self.thermal_network.R_total
-            return calculated_temp - conductor_temp
-        
-        # Solve for conductor temperature
-        try:
-            result = opt.fsolve(temp_equation, ambient_temp + 50)
-            return float(result[0])
-        except:
-            # Fallback calculation
-            R_20 = self.thermal_network.materials.conductor_resistivity / conductor_area
-            losses_approx = current ** 2 * R_20
-            return ambient_temp + losses_approx * self.thermal_network.R_total
-    
-    def calculate_emergency_current(self, initial_current, emergency_duration, max_temp, ambient_temp, conductor_area=500):
-        """Calculate emergency current rating according to IEC 60853-2"""
+    def calculate_steady_state_temperature(self, current, ambient_temp, conductor_area=None):
+        """Calculate steady-state conductor temperature
+        
+        current and ambient_temp may also be arrays, the result is broadcast over them.
+        """
+        R_20 = self.conductor_resistance_20(conductor_area)
+        
+        if np.ndim(current) or np.ndim(ambient_temp):
+            conductor_temp = _steady_state_temperature_array(
+                np.asarray(current, dtype=float), np.asarray(ambient_temp, dtype=float), R_20,
+                self.thermal_network.R_total, self.temperature_coefficient
+            )
+            # Fallback calculation where there is no steady state
+            losses_approx = np.square(current) * R_20
+            return np.where(np.isfinite(conductor_temp), conductor_temp,
+                            ambient_temp + losses_approx * self.thermal_network.R_total)
+        
+        # Sweeps repeat the same operating points, reuse earlier results
+        current, ambient_temp = float(current), float(ambient_temp)
+        key = (current, ambient_temp, R_20, self.thermal_network.version)
+        conductor_temp = self._steady_state_cache.get(key)
+        if conductor_temp is not None:
+            return conductor_temp
+        
+        conductor_temp = _steady_state_temperature_scalar(
+            current, ambient_temp, R_20,
+            self.thermal_network.R_total, self.temperature_coefficient
+        )
+        
+        if len(self._steady_state_cache) >= STEADY_STATE_CACHE_SIZE:
+            self._steady_state_cache.clear()
+        self._steady_state_cache[key] = conductor_temp
+        return conductor_temp
+    
+    def calculate_steady_state_temperature_batch(self, currents, ambient_temp, conductor_area=None):
+        """Calculate steady-state conductor temperatures for a 1-D array of currents"""
+        currents = np.ascontiguousarray(currents, dtype=float)
+        R_20 = self.conductor_resistance_20(conductor_area)
+        conductor_temp = _steady_state_temperature_batch(
+            currents, float(ambient_temp), R_20,
+            self.thermal_network.R_total, self.temperature_coefficient
+        )
+        
+        # Fallback calculation where there is no steady state
+        losses_approx = np.square(currents) * R_20
+        return np.where(np.isfinite(conductor_temp), conductor_temp,
+                        ambient_temp + losses_approx * self.thermal_network.R_total)
+    
+    def calculate_emergency_current(self, initial_current, emergency_duration, max_temp, ambient_temp, conductor_area=None, full_output=False):
+        """Calculate emergency current rating according to IEC 60853-2
+        
+        Any of initial_current, emergency_duration, max_temp and ambient_temp may be
+        arrays, the rating is then broadcast over them in one vectorized pass.
+        With full_output the initial steady-state temperature and the temperature
+        at the end of the emergency are returned as well.
+        """
+        # Array inputs, lists included, take the vectorized path
+        vectorized = any(np.ndim(value) for value in (initial_current, emergency_duration, max_temp, ambient_temp))
+        if vectorized:
+            initial_current, emergency_duration, max_temp, ambient_temp = (
+                np.asarray(value, dtype=float) for value in (initial_current, emergency_duration, max_temp, ambient_temp)
+            )
+        
         # Calculate initial steady-state temperature
         initial_temp = self.calculate_steady_state_temperature(initial_current, ambient_temp, conductor_area)
         
-        # Calculate thermal time constant
-        total_capacitance = (self.thermal_network.C_conductor + 
-                           self.thermal_network.C_insulation + 
-                           self.thermal_network.C_sheath)
-        tau = total_capacitance * self.thermal_network.R_total  # seconds
+        # Thermal time constant
+        tau = self.thermal_network.tau  # seconds
         
         # Convert duration to seconds
         duration_seconds = emergency_duration * 3600
@@ -152,50 +388,101 @@ class EmergencyRatingCalculator:
         # For transient heating: θ_f = θ_i + (θ_ss - θ_i) * [1 - exp(-t/τ)]
         # Rearranging for emergency current
         
-        def emergency_equation(emergency_current):
-            # Calculate steady-state temperature for emergency current
-            emergency_ss_temp = self.calculate_steady_state_temperature(emergency_current, ambient_temp, conductor_area)
-            
-            # Calculate transient temperature after emergency duration
-            temp_rise = (emergency_ss_temp - initial_temp) * (1 - np.exp(-duration_seconds / tau))
-            final_temp = initial_temp + temp_rise
-            
-            return final_temp - max_temp
+        # Solve for emergency current
+        # θ_ss(I) is monotonic in I, so the closed-form inverse is exact wherever a root
+        # exists and no iterative solver is needed; when it returns NaN there is no root
+        # (the target lies past thermal runaway) and the simplified fallback applies
+        R_20 = self.conductor_resistance_20(conductor_area)
         
-        try:
-            # Solve for emergency current
-            result = opt.fsolve(emergency_equation, initial_current * 1.5)
-            emergency_current = float(result[0])
+        if vectorized:
+            decay = -np.expm1(-duration_seconds / tau)
+            emergency_current = _emergency_current_array(
+                initial_temp, max_temp, ambient_temp, decay, R_20,
+                self.thermal_network.R_total, self.temperature_coefficient
+            )
             
-            # Ensure positive result
-            if emergency_current < 0:
-                emergency_current = initial_current
-                
-            return emergency_current
-        except:
-            # Fallback simplified calculation
-            temp_ratio = (max_temp - ambient_temp) / (initial_temp - ambient_temp)
-            return initial_current * np.sqrt(max(temp_ratio, 0.1))
-    
-    def calculate_transient_temperature(self, initial_current, emergency_current, duration_hours, ambient_temp, conductor_area=500, time_points=100):
-        """Calculate transient temperature profile"""
+            # Fallback simplified calculation where there is no solution, keeping the
+            # initial loading when there is no emergency time or no temperature rise to scale
+            temp_rise = initial_temp - ambient_temp
+            with np.errstate(divide='ignore', invalid='ignore'):
+                temp_ratio = (max_temp - ambient_temp) / temp_rise
+                fallback = np.where((decay > 0.0) & (temp_rise != 0.0),
+                                    initial_current * np.sqrt(np.maximum(temp_ratio, 0.1)), initial_current)
+            emergency_current = np.where(np.isfinite(emergency_current), emergency_current, fallback)
+        else:
+            decay = -math.expm1(-duration_seconds / tau)
+            emergency_current = _emergency_current_scalar(
+                initial_current, initial_temp, float(max_temp), float(ambient_temp), decay, R_20,
+                self.thermal_network.R_total, self.temperature_coefficient
+            )
+        
+        if full_output:
+            emergency_temp = self.calculate_steady_state_temperature(emergency_current, ambient_temp, conductor_area)
+            end_temp = initial_temp + (emergency_temp - initial_temp) * decay
+            return emergency_current, initial_temp, end_temp
+        return emergency_current
+    
+    def calculate_transient_temperature(self, initial_current, emergency_current, duration_hours, ambient_temp, conductor_area=None, time_points=100, full_output=False):
+        """Calculate transient temperature profile
+        
+        Time and temperature arrays are float32. emergency_current may also be a 1-D
+        array, the temperatures are then returned as a (len(emergency_current), time_points)
+        array with one curve per current.
+        With full_output the maximum and final temperatures are returned as well.
+        """
         # Calculate initial and final steady-state temperatures
         initial_temp = self.calculate_steady_state_temperature(initial_current, ambient_temp, conductor_area)
         final_temp = self.calculate_steady_state_temperature(emergency_current, ambient_temp, conductor_area)
         
-        # Calculate thermal time constant
-        total_capacitance = (self.thermal_network.C_conductor + 
-                           self.thermal_network.C_insulation + 
-                           self.thermal_network.C_sheath)
-        tau = total_capacitance * self.thermal_network.R_total  # seconds
+        # Thermal time constant
+        tau = self.thermal_network.tau  # seconds
         
         # Time array
         time_array = np.linspace(0, duration_hours * 3600, time_points)
         
-        # Temperature array
-        temp_array = initial_temp + (final_temp - initial_temp) * (1 - np.exp(-time_array / tau))
+        if np.ndim(emergency_current):
+            # One curve per emergency current, broadcast against the shared time axis
+            decay = -np.expm1(-time_array / tau)
+            temp_array = initial_temp + (final_temp[:, None] - initial_temp) * decay[None, :]
+            
+            # Computed in float64, returned as float32 to halve the output size
+            time_hours = (time_array / 3600).astype(np.float32)
+            if full_output:
+                return time_hours, temp_array.astype(np.float32), temp_array.max(axis=1), temp_array[:, -1]
+            return time_hours, temp_array.astype(np.float32)
+        
+        # Temperature array, the kernel works in float64 and stores into the float32 output
+        temp_array, max_temp, end_temp = _transient_temperature(
+            time_array, initial_temp, final_temp, tau, np.empty(time_points, dtype=np.float32)
+        )
+        
+        time_hours = (time_array / 3600).astype(np.float32)  # Return time in hours
+        if full_output:
+            return time_hours, temp_array, max_temp, end_temp
+        return time_hours, temp_array
+
+    def compile(self, conductor_area=None, max_temp=90):
+        """Build a rating function specialized to this network, conductor area and max_temp
+        
+        Returns f(initial_current, ambient_temp, duration_hours) -> emergency current for
+        scalar inputs, with every geometry and material constant captured as a local so
+        repeated evaluations skip the attribute lookups and the steady-state memo. It runs
+        the same scalar helpers as calculate_emergency_current.
+        """
+        R_20 = self.conductor_resistance_20(conductor_area)
+        R_total = self.thermal_network.R_total
+        alpha = self.temperature_coefficient
+        seconds_per_tau = 3600.0 / self.thermal_network.tau
+        max_temp = float(max_temp)
+        
+        def emergency_current(initial_current, ambient_temp, duration_hours):
+            initial_current, ambient_temp = float(initial_current), float(ambient_temp)
+            initial_temp = _steady_state_temperature_scalar(initial_current, ambient_temp, R_20, R_total, alpha)
+            decay = -math.expm1(-duration_hours * seconds_per_tau)
+            return _emergency_current_scalar(initial_current, initial_temp, max_temp, ambient_temp,
+                                             decay, R_20, R_total, alpha)
         
-        return time_array / 3600, temp_array  # Return time in hours
+        return emergency_current
 
 class RadialTemperatureCalculator:
     """Calculate radial temperature distribution in cable"""
@@ -203,9 +490,9 @@ class RadialTemperatureCalculator:
         self.thermal_network = thermal_network
     
     def calculate_radial_profile(self, current, ambient_temp, conductor_area=500, radial_points=50):
-        """Calculate radial temperature distribution"""
+        """Calculate radial temperature distribution as float32 arrays"""
         # Calculate conductor temperature
-        calculator = EmergencyRatingCalculator(self.thermal_network)
+        calculator = EmergencyRatingCalculator(self.thermal_network, conductor_area)
         conductor_temp = calculator.calculate_steady_state_temperature(current, ambient_temp, conductor_area)
         
         # Calculate conductor losses
@@ -218,31 +505,123 @@ class RadialTemperatureCalculator:
         r_max = r_sheath * 3  # Extend to 3x sheath radius
         
         radius_array = np.linspace(r_conductor, r_max, radial_points)
-        temp_array = np.zeros(radial_points)
-        
-        for i, r in enumerate(radius_array):
-            if r <= r_conductor:
-                # Inside conductor (uniform temperature)
-                temp_array[i] = conductor_temp
-            elif r <= r_insulation:
-                # Inside insulation
-                thermal_resistance = (1 / (2 * np.pi * self.thermal_network.materials.insulation_thermal_conductivity)) * \
-                                   np.log(r / r_conductor)
-                temp_array[i] = conductor_temp - conductor_losses * thermal_resistance
-            elif r <= r_sheath:
-                # Inside sheath
-                R_ins_total = self.thermal_network.R_ins
-                thermal_resistance = R_ins_total + \
-                                   (1 / (2 * np.pi * self.thermal_network.materials.sheath_thermal_conductivity)) * \
-                                   np.log(r / r_insulation)
-                temp_array[i] = conductor_temp - conductor_losses * thermal_resistance
+        network = self.thermal_network
+        temp_array = _radial_profile(
+            radius_array, conductor_temp, conductor_losses, r_conductor, r_insulation, r_sheath,
+            network.R_ins, network.R_sheath, network.inv2pi_ins, network.inv2pi_sheath, network.inv2pi_soil
+        )
+        
+        # Computed in float64, returned as float32 to halve the output size
+        return radius_array.astype(np.float32), temp_array.astype(np.float32)
+
+def calculate_emergency_current_grid(thermal_network, currents, durations, ambients, max_temp=90, conductor_area=500):
+    """Calculate emergency current ratings over a full parameter grid
+    
+    currents (A), durations (hours) and ambients (°C) are 1-D arrays; the result is a
+    (len(currents), len(durations), len(ambients)) array from one vectorized pass,
+    use this instead of looping over calculate_emergency_current.
+    """
+    current_grid, duration_grid, ambient_grid = np.ix_(
+        np.asarray(currents, dtype=float), np.asarray(durations, dtype=float), np.asarray(ambients, dtype=float)
+    )
+    calculator = EmergencyRatingCalculator(thermal_network, conductor_area)
+    return calculator.calculate_emergency_current(current_grid, duration_grid, max_temp, ambient_grid)
+
+def _monte_carlo_chunk(task):
+    """Rate one chunk of Monte Carlo samples, runs in a worker process"""
+    chunk_size, seed, geometry, conductor_material, burial_depth_mm, param_distributions, rating_args = task
+    
+    # Draw every sampled parameter for the chunk at once
+    rng = np.random.default_rng(seed)
+    samples = {name: getattr(rng, distribution)(*args, size=chunk_size)
+               for name, (distribution, *args) in param_distributions.items()}
+    
+    ratings = np.empty(chunk_size, dtype=np.float32)
+    
+    # With only operating conditions sampled the network is fixed, rate the whole chunk in one call
+    if set(samples) <= {'initial_current', 'ambient_temp', 'emergency_duration'}:
+        network = ThermalNetwork(geometry, MaterialProperties(conductor_material), burial_depth_mm)
+        calculator = EmergencyRatingCalculator(network, rating_args['conductor_area'])
+        ratings[:] = calculator.calculate_emergency_current(
+            samples.get('initial_current', rating_args['initial_current']),
+            samples.get('emergency_duration', rating_args['emergency_duration']),
+            rating_args['max_temp'],
+            samples.get('ambient_temp', rating_args['ambient_temp'])
+        )
+        return ratings
+    
+    for i in range(chunk_size):
+        materials = MaterialProperties(conductor_material)
+        sample_depth = burial_depth_mm
+        sample_args = dict(rating_args)
+        for name, values in samples.items():
+            if name == 'burial_depth_mm':
+                sample_depth = float(values[i])
+            elif name in sample_args:
+                sample_args[name] = float(values[i])
             else:
-                # Outside cable (soil)
-                R_cable = self.thermal_network.R_ins + self.thermal_network.R_sheath
-                thermal_resistance = R_cable + \
-                                   (1 / (2 * np.pi * self.thermal_network.materials.soil_thermal_conductivity)) * \
-                                   np.log(r / r_sheath)
-                temp_array[i] = conductor_temp - conductor_losses * thermal_resistance
+                setattr(materials, name, float(values[i]))
         
-        return radius_array, temp_array
+        calculator = EmergencyRatingCalculator(ThermalNetwork(geometry, materials, sample_depth),
+                                               sample_args.pop('conductor_area'))
+        ratings[i] = calculator.calculate_emergency_current(**sample_args)
+    return ratings
+
+def monte_carlo_rating(n_samples, param_distributions, geometry, conductor_material='CU', burial_depth_mm=1000,
+                       initial_current=400, emergency_duration=6, max_temp=90, ambient_temp=20,
+                       conductor_area=500, percentiles=(5, 50, 95), seed=None, processes=None):
+    """Estimate the emergency current rating under parameter uncertainty
+    
+    param_distributions maps a parameter name to a numpy Generator distribution and its
+    arguments, e.g. {'soil_thermal_conductivity': ('normal', 1.0, 0.1)}. Names are
+    burial_depth_mm, one of MONTE_CARLO_RATING_PARAMETERS or a MaterialProperties
+    attribute. Samples are rated in chunks across worker processes; each chunk gets its
+    own seed spawned from seed, so results are reproducible for a given seed and number
+    of processes.
+    """
+    if n_samples < 1:
+        raise ValueError("n_samples must be at least 1")
+    
+    rating_args = {
+        'initial_current': initial_current,
+        'emergency_duration': emergency_duration,
+        'max_temp': max_temp,
+        'ambient_temp': ambient_temp,
+        'conductor_area': conductor_area
+    }
+    materials = MaterialProperties(conductor_material)
+    for name in param_distributions:
+        if name != 'burial_depth_mm' and name not in MONTE_CARLO_RATING_PARAMETERS and not hasattr(materials, name):
+            raise ValueError(f"Unknown Monte Carlo parameter: {name}")
+    
+    # Several chunks per process keeps the workers evenly loaded
+    processes = processes or os.cpu_count() or 1
+    chunk_size = max(1, n_samples // (8 * processes))
+    chunk_sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(size, chunk_seed, geometry, conductor_material, burial_depth_mm, param_distributions, rating_args)
+             for size, chunk_seed in zip(chunk_sizes, seeds)]
+    
+    # Stream chunks into one float32 buffer as they finish
+    ratings = np.empty(n_samples, dtype=np.float32)
+    filled = 0
+    with multiprocessing.Pool(processes) as pool:
+        for chunk in pool.imap_unordered(_monte_carlo_chunk, tasks):
+            ratings[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+    
+    return {
+        'n_samples': n_samples,
+        'mean': float(np.mean(ratings, dtype=np.float64)),
+        'std': float(np.std(ratings, dtype=np.float64)),
+        'percentiles': dict(zip(percentiles, np.percentile(ratings, percentiles).tolist()))
+    }
 
+def warm_up_kernels():
+    """Run each calculation once so the compiled kernels are loaded before serving"""
+    thermal_network = ThermalNetwork(CableGeometry(25.4, 4.5, 2.0), MaterialProperties('CU'))
+    calculator = EmergencyRatingCalculator(thermal_network)
+    calculator.calculate_emergency_current(400, 6, 90, 20)
+    calculator.calculate_steady_state_temperature_batch(np.array([400.0, 600.0]), 20)
+    calculator.calculate_transient_temperature(400, 600, 6, 20)
+    RadialTemperatureCalculator(thermal_network).calculate_radial_profile(400, 20)